@@ -0,0 +1,74 @@
+# ============================================
+# ENTITY CACHE - Short-TTL cache for GET /{id}
+# Like Spring's @Cacheable / @CacheEvict with Caffeine
+# ============================================
+#
+# Process-local: each worker has its own copy, so a write evicts only
+# the local entry - the short TTL bounds staleness in the other workers.
+# Values are Pydantic snapshots, never ORM objects (those belong to the
+# session that loaded them).
+#
+# A GET that read the row before a concurrent write committed could
+# store it after the writer's evict. Readers take cache_version() before
+# the SELECT and put_cached() skips the store if an evict came in between.
+
+from threading import Lock
+
+from cachetools import TTLCache
+
+ENTITY_CACHE_TTL_SECONDS = 10
+_entity_cache = TTLCache(maxsize=10_000, ttl=ENTITY_CACHE_TTL_SECONDS)
+_entity_cache_lock = Lock()  # TTLCache is not thread-safe
+
+# Evict counters in fixed stripes (bounded memory; a collision only
+# skips one store)
+_VERSION_STRIPES = 4096
+_entity_versions = [0] * _VERSION_STRIPES
+
+
+def get_cached(model, pk: int):
+    """
+    Cached snapshot of a row, or None on a miss
+
+    JAVA EQUIVALENT:
+    cacheManager.getCache("products").get(id)
+    """
+    with _entity_cache_lock:
+        return _entity_cache.get((model, pk))
+
+
+def cache_version(model, pk: int) -> int:
+    """
+    Evict counter for a row - read it before loading the row on a miss
+    """
+    with _entity_cache_lock:
+        return _entity_versions[_stripe(model, pk)]
+
+
+def put_cached(model, pk: int, value, version: int) -> None:
+    """
+    Store a snapshot of a row, unless it was evicted since `version`
+    was read (the snapshot may predate that write)
+
+    JAVA EQUIVALENT:
+    @Cacheable(value = "products", key = "#id")
+    """
+    with _entity_cache_lock:
+        if _entity_versions[_stripe(model, pk)] == version:
+            _entity_cache[(model, pk)] = value
+
+
+def evict_cached(model, pk: int) -> None:
+    """
+    Drop a row from the cache - call after updating/deleting it
+
+    JAVA EQUIVALENT:
+    @CacheEvict(value = "products", key = "#id")
+    """
+    with _entity_cache_lock:
+        _entity_versions[_stripe(model, pk)] += 1
+        _entity_cache.pop((model, pk), None)
+
+
+def _stripe(model, pk: int) -> int:
+    return hash((model, pk)) % _VERSION_STRIPES
@@ -3,9 +3,14 @@
 # Like Spring's DataSource configuration
 # ============================================
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import scoped_session, sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool, StaticPool
+from contextvars import ContextVar
 import os
+import shutil
+import threading
 
 # Get the directory where this file is located
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -13,17 +18,112 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 # SQLite database file path - data persists here!
 DATABASE_PATH = os.path.join(BASE_DIR, "data", "erp.db")
 
+# Pre-seeded database copied into place on first launch.
+# Lives in app/ because the Docker image only ships that directory.
+TEMPLATE_DB_PATH = os.path.join(BASE_DIR, "app", "erp.seed.db")
+
+# Schema revision stamped into PRAGMA user_version (like Flyway's version).
+# Bump it when a model adds a table or index - init_db re-runs create_all.
+# create_all never alters existing tables, so a new column also needs an
+# explicit ALTER TABLE step in init_db alongside the bump.
+SCHEMA_VERSION = 2
+
+# Indexes removed from the models - dropped from older databases.
+# ix_*_id duplicated the INTEGER PRIMARY KEY (SQLite's rowid) and only
+# cost an extra B-tree write per INSERT.
+DROPPED_INDEXES = ("ix_products_id", "ix_customers_id", "ix_users_id")
+
 # Database URL (like jdbc:h2:file:./data/erp in Java)
 DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
 
+# Async driver for read-heavy endpoints (aiosqlite)
+ASYNC_DATABASE_URL = DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1)
+
+# Connection pool settings (like HikariCP's maximumPoolSize)
+# FastAPI runs sync endpoints in a threadpool, so size the pool for it.
+# SQLALCHEMY_POOL_SIZE / SQLALCHEMY_MAX_OVERFLOW override the defaults.
+POOL_SIZE = int(os.getenv("SQLALCHEMY_POOL_SIZE", "25"))
+MAX_OVERFLOW = int(os.getenv("SQLALCHEMY_MAX_OVERFLOW", "25"))
+
+# DB_POOL=static makes every sync session share ONE connection - for
+# single-threaded scripts only. Concurrent sessions would interleave
+# their transactions on it (one request's rollback discards another's
+# uncommitted writes), so the API refuses to start with it.
+STATIC_POOL = os.getenv("DB_POOL") == "static"
+
+QUEUE_POOL_OPTIONS = {
+    "poolclass": QueuePool,
+    "pool_size": POOL_SIZE,
+    "max_overflow": MAX_OVERFLOW,
+    "pool_pre_ping": True,   # Like HikariCP's connectionTestQuery
+    "pool_recycle": 1800,    # Recycle connections after 30 minutes
+}
+POOL_OPTIONS = {"poolclass": StaticPool} if STATIC_POOL else QUEUE_POOL_OPTIONS
+ASYNC_POOL_OPTIONS = {**QUEUE_POOL_OPTIONS, "poolclass": AsyncAdaptedQueuePool}
+
 # Create engine (like DataSource in Spring)
 engine = create_engine(
     DATABASE_URL,
-    connect_args={"check_same_thread": False}  # Needed for SQLite
+    connect_args={"check_same_thread": False},  # Needed for SQLite
+    query_cache_size=1200,  # Compiled SQL cache (default 500 statements)
+    echo=os.getenv("SQL_ECHO") == "1",  # Logs show "[cached since ...]" on cache hits
+    **POOL_OPTIONS
 )
 
+# Async engine (like a reactive R2DBC ConnectionFactory).
+# Used for reads only - aiosqlite INSERTs are slower than the sync driver,
+# so writes stay on `engine`.
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    query_cache_size=1200,
+    echo=os.getenv("SQL_ECHO") == "1",
+    **ASYNC_POOL_OPTIONS
+)
+
+# SQLite tuning applied to every new DBAPI connection
+# (like HikariCP's connectionInitSql)
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",       # Readers don't block writers (and vice versa)
+    "PRAGMA synchronous=NORMAL",     # Safe with WAL, far fewer fsyncs per commit
+    "PRAGMA temp_store=MEMORY",      # Temp tables / sorts stay in RAM
+    "PRAGMA cache_size=-64000",      # ~64 MB page cache per connection
+    "PRAGMA mmap_size=268435456",    # 256 MB memory-mapped I/O
+    "PRAGMA foreign_keys=ON",        # SQLite ships with FK enforcement off
+)
+
+
+@event.listens_for(engine, "connect")
+@event.listens_for(async_engine.sync_engine, "connect")
+def _set_sqlite_pragma(dbapi_conn, _):
+    cursor = dbapi_conn.cursor()
+    for pragma in SQLITE_PRAGMAS:
+        cursor.execute(pragma)
+    cursor.close()
+
+
 # Session factory (like EntityManagerFactory)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False keeps loaded attributes usable after commit
+# instead of re-SELECTing them on first access
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+# One session per HTTP request for the sync write endpoints
+# (like Spring's request-scoped EntityManager). Keyed by a context
+# variable, not the thread: FastAPI may run a request's sync code on
+# different threadpool threads, and the context follows it there.
+_session_scope: ContextVar = ContextVar("session_scope", default=None)
+
+
+def _session_scope_key():
+    # Outside a request (scripts, startup) fall back to the thread
+    return _session_scope.get() or threading.get_ident()
+
+
+ScopedSession = scoped_session(SessionLocal, scopefunc=_session_scope_key)
+
+# Async session factory - same settings; an implicit lazy re-SELECT
+# would be an error on an AsyncSession anyway
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 # Base class for models (like @MappedSuperclass)
 Base = declarative_base()
@@ -32,6 +132,10 @@ Base = declarative_base()
 def get_db():
     """
     Dependency that provides database session.
+
+    Not used by the routers (reads take get_async_db, writes use
+    ScopedSession); kept as the plain Depends(get_db) that QUICK_START.md
+    and docs/CONCEPTS.md build their examples on.
     
     JAVA EQUIVALENT:
     @Autowired
@@ -48,14 +152,131 @@ def get_db():
         db.close()
 
 
+class SessionScopeMiddleware:
+    """
+    Opens a session scope per HTTP request and closes the request's
+    ScopedSession (if it used one) when the response is done.
+    Plain ASGI middleware - no per-request task like @app.middleware.
+
+    Handlers commit or roll back before returning (the repo helpers roll
+    back on a miss), so this only closes an idle session - no I/O on the
+    event loop.
+
+    JAVA EQUIVALENT:
+    OpenEntityManagerInViewFilter
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = _session_scope.set(object())
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            ScopedSession.remove()  # no-op when the request never used it
+            _session_scope.reset(token)
+
+
+async def get_async_db():
+    """
+    Dependency that provides an async database session (read endpoints).
+    Queries are awaited, so the event loop keeps serving other requests
+    instead of parking each one on a threadpool worker.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 def init_db():
     """
     Create all tables if they don't exist.
-    Like Hibernate's hbm2ddl.auto=update
+    Like Hibernate's hbm2ddl.auto=update, but only when PRAGMA
+    user_version is behind SCHEMA_VERSION.
+
+    A brand new database is copied from the pre-seeded template
+    first (one file copy vs. DDL + INSERTs + fsyncs), then goes
+    through the same version check.
     """
+    if not os.path.exists(DATABASE_PATH) and os.path.exists(TEMPLATE_DB_PATH):
+        os.makedirs(os.path.dirname(DATABASE_PATH), exist_ok=True)
+        # Copy under a private name, then hard-link it into place: the
+        # link fails if another worker got there first, and nobody ever
+        # sees a half-copied file
+        tmp_path = f"{DATABASE_PATH}.{os.getpid()}.tmp"
+        shutil.copyfile(TEMPLATE_DB_PATH, tmp_path)
+        try:
+            os.link(tmp_path, DATABASE_PATH)
+            print(f"Database created from template: {DATABASE_PATH}")
+        except FileExistsError:
+            pass
+        except OSError:
+            # No hard links on this volume (some bind mounts, network or
+            # FAT filesystems): rename instead - still never half-copied,
+            # but a worker racing us here may swap in its identical copy
+            if not os.path.exists(DATABASE_PATH):
+                os.replace(tmp_path, DATABASE_PATH)
+                print(f"Database created from template: {DATABASE_PATH}")
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    # Schema already current: skip the DDL checks (and the write lock).
+    # Also checked right after a template copy, in case the template
+    # was not regenerated after a SCHEMA_VERSION bump.
+    if _schema_version() == SCHEMA_VERSION:
+        return
+
     # Import models so SQLAlchemy knows about them
-    from app.models import product_model, customer_model, user_model
+    from app.models import product_model, customer_model, user_model, meta_model
+
+    with engine.begin() as conn:
+        # Take SQLite's write lock up front: worker processes starting
+        # together run the schema checks one after another
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+        if _schema_version(conn) == SCHEMA_VERSION:
+            return  # Another worker migrated while we waited
 
-    # Create tables
-    Base.metadata.create_all(bind=engine)
+        # Create tables
+        Base.metadata.create_all(bind=conn)
+
+        # create_all skips existing tables, so add any newly declared indexes
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=conn, checkfirst=True)
+
+        for name in DROPPED_INDEXES:
+            conn.exec_driver_sql(f"DROP INDEX IF EXISTS {name}")
+
+        conn.exec_driver_sql(f"PRAGMA user_version = {SCHEMA_VERSION}")
     print(f"Database initialized at: {DATABASE_PATH}")
+
+
+def _schema_version(conn=None) -> int:
+    """Read PRAGMA user_version (0 on a database we never stamped)"""
+    if conn is None:
+        with engine.connect() as conn:
+            return conn.exec_driver_sql("PRAGMA user_version").scalar()
+    return conn.exec_driver_sql("PRAGMA user_version").scalar()
+
+
+def optimize_db():
+    """
+    Let SQLite refresh its query planner statistics (sqlite_stat1).
+    Cheap when nothing changed; recommended before closing connections.
+    """
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA optimize")
+
+
+def checkpoint_db():
+    """
+    Flush the WAL file back into the main database file.
+    Called on shutdown so the -wal file doesn't grow unbounded.
+    """
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
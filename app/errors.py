@@ -0,0 +1,75 @@
+# ============================================
+# HTTP ERRORS - shared 404 / 400 / 422 responses
+# Like Spring's ResponseStatusException
+# ============================================
+#
+# Details are small dicts with a fixed shape, e.g.
+#     {"code": "not_found", "entity": "Product", "id": 5}
+# so clients can branch on "code" and the handler in main.py encodes
+# them with orjson - no message formatting per error.
+#
+# Helpers build a fresh exception per raise: a shared module-level
+# HTTPException instance would pick up the __traceback__ (and frames)
+# of every request that raised it, across threads.
+
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy.exc import IntegrityError
+
+from app.repo import unique_violation
+
+
+def not_found(entity: str, entity_id: int) -> HTTPException:
+    """
+    404 for a missing row: raise not_found("Product", product_id)
+
+    JAVA EQUIVALENT:
+    throw new ResponseStatusException(HttpStatus.NOT_FOUND, "Product not found");
+    """
+    return HTTPException(
+        status.HTTP_404_NOT_FOUND,
+        {"code": "not_found", "entity": entity, "id": entity_id}
+    )
+
+
+def already_exists(entity: str, field: Optional[str], value=None) -> HTTPException:
+    """
+    400 for a unique column clash: raise already_exists("User", "email", email)
+    `value` is left out for bulk requests, where the clashing row is unknown.
+
+    JAVA EQUIVALENT:
+    throw new ResponseStatusException(HttpStatus.BAD_REQUEST, "Email already exists");
+    """
+    detail = {"code": "already_exists", "entity": entity, "field": field}
+    if value is not None:
+        detail["value"] = value
+    return HTTPException(status.HTTP_400_BAD_REQUEST, detail)
+
+
+def constraint_failed(entity: str) -> HTTPException:
+    """
+    422 for a constraint other than UNIQUE (NOT NULL, CHECK, FOREIGN KEY)
+
+    JAVA EQUIVALENT:
+    throw new ResponseStatusException(HttpStatus.UNPROCESSABLE_ENTITY, "Invalid customer");
+    """
+    return HTTPException(
+        status.HTTP_422_UNPROCESSABLE_ENTITY,
+        {"code": "constraint_failed", "entity": entity}
+    )
+
+
+def integrity_error(entity: str, error: IntegrityError, data: Optional[dict] = None) -> HTTPException:
+    """
+    Map an IntegrityError to a response: a UNIQUE clash becomes
+    already_exists naming the rejected column (its value taken from
+    `data` when given), anything else becomes constraint_failed.
+
+    JAVA EQUIVALENT:
+    @ExceptionHandler(DataIntegrityViolationException.class)
+    """
+    field = unique_violation(error)
+    if field is None:
+        return constraint_failed(entity)
+    return already_exists(entity, field, (data or {}).get(field))
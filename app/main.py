@@ -1,82 +1,154 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response
+from fastapi.utils import is_body_allowed_for_status_code
+from starlette.exceptions import HTTPException as StarletteHTTPException
 from contextlib import asynccontextmanager
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 from app.routers import products, customers, users, auth
-from app.database import init_db, SessionLocal
+from app.routers.auth import hash_password
+from app.database import Base, engine, async_engine, init_db, optimize_db, checkpoint_db, SessionLocal, SessionScopeMiddleware, TEMPLATE_DB_PATH, SCHEMA_VERSION, STATIC_POOL
 from app.models.product_model import ProductModel
 from app.models.customer_model import CustomerModel
 from app.models.user_model import UserModel
-import hashlib
+from app.models.meta_model import MetaModel
+import gzip
+import os
+import sqlite3
+
+
+# Pre-built seed data (like Spring's data.sql), gzipped SQL script
+SEED_SQL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "seed.sql.gz")
+SEEDED_MODELS = (ProductModel, CustomerModel, UserModel)
+
 
 
 def seed_data():
     """
     Add initial data if database is empty.
     Like Spring's data.sql or CommandLineRunner
+
+    Runs app/seed.sql.gz as one script, which also records the "seeded"
+    marker, so later startups only do one primary-key lookup.
     """
     db = SessionLocal()
     try:
-        # Check if products exist
-        if db.query(ProductModel).count() == 0:
-            print("Seeding products...")
-            products_data = [
-                ProductModel(name="Laptop", description="High-performance laptop", price=999.99, stock=50, category="Electronics"),
-                ProductModel(name="Mouse", description="Wireless mouse", price=29.99, stock=100, category="Accessories"),
-                ProductModel(name="Keyboard", description="Mechanical keyboard", price=89.99, stock=75, category="Accessories"),
-                ProductModel(name="Monitor", description="27-inch 4K monitor", price=449.99, stock=30, category="Electronics"),
-            ]
-            db.add_all(products_data)
-            db.commit()
-            print(f"Added {len(products_data)} products")
-
-        # Check if customers exist
-        if db.query(CustomerModel).count() == 0:
-            print("Seeding customers...")
-            customers_data = [
-                CustomerModel(name="John Doe", email="john@example.com", phone="+1234567890", address="123 Main St, New York, NY", company="Acme Corp"),
-                CustomerModel(name="Jane Smith", email="jane@example.com", phone="+0987654321", address="456 Oak Ave, Los Angeles, CA", company="Tech Solutions"),
-                CustomerModel(name="Bob Johnson", email="bob@example.com", phone="+1122334455", address="789 Pine Rd, Chicago, IL", company="Global Industries"),
-            ]
-            db.add_all(customers_data)
-            db.commit()
-            print(f"Added {len(customers_data)} customers")
-
-        # Check if users exist
-        if db.query(UserModel).count() == 0:
-            print("Seeding users...")
-            users_data = [
-                UserModel(
-                    username="admin",
-                    email="admin@example.com",
-                    password_hash=hashlib.sha256("admin123".encode()).hexdigest(),
-                    full_name="Admin User",
-                    role="admin",
-                    is_active=True
-                ),
-                UserModel(
-                    username="manager",
-                    email="manager@example.com",
-                    password_hash=hashlib.sha256("manager123".encode()).hexdigest(),
-                    full_name="Manager User",
-                    role="manager",
-                    is_active=True
-                ),
-                UserModel(
-                    username="johndoe",
-                    email="john.user@example.com",
-                    password_hash=hashlib.sha256("password123".encode()).hexdigest(),
-                    full_name="John Doe",
-                    role="user",
-                    is_active=True
-                ),
-            ]
-            db.add_all(users_data)
+        if db.get(MetaModel, "seeded") is not None:
+            return
+
+        # Database filled before the marker existed - just record it
+        # (ON CONFLICT DO NOTHING: another worker may be doing the same)
+        if any(db.scalar(select(model.id).limit(1)) is not None for model in SEEDED_MODELS):
+            db.execute(
+                sqlite_insert(MetaModel).values(key="seeded", value="1").on_conflict_do_nothing()
+            )
             db.commit()
-            print(f"Added {len(users_data)} users")
+            return
     finally:
         db.close()
 
+    print("Seeding database from seed.sql.gz...")
+    with open(SEED_SQL_PATH, "rb") as f:
+        script = gzip.decompress(f.read()).decode()
+
+    # executescript() runs the whole dump in one call (no ORM, no mappers)
+    raw_conn = engine.raw_connection()
+    try:
+        raw_conn.driver_connection.executescript(script)
+    except sqlite3.IntegrityError:
+        # The dump inserts the marker first, so with several workers
+        # starting at once only one of them can seed
+        raw_conn.rollback()
+        print("Database already seeded by another worker")
+    finally:
+        raw_conn.close()
+
+
+def build_seed_sql() -> str:
+    """
+    Render the sample rows as a single SQL script.
+    The marker goes first, then each table as one multi-row INSERT.
+    Sample passwords are bcrypt-hashed here, so only when regenerating.
+    """
+    products_data = [
+        dict(name="Laptop", description="High-performance laptop", price=999.99, stock=50, category="Electronics"),
+        dict(name="Mouse", description="Wireless mouse", price=29.99, stock=100, category="Accessories"),
+        dict(name="Keyboard", description="Mechanical keyboard", price=89.99, stock=75, category="Accessories"),
+        dict(name="Monitor", description="27-inch 4K monitor", price=449.99, stock=30, category="Electronics"),
+    ]
+    customers_data = [
+        dict(name="John Doe", email="john@example.com", phone="+1234567890", address="123 Main St, New York, NY", company="Acme Corp"),
+        dict(name="Jane Smith", email="jane@example.com", phone="+0987654321", address="456 Oak Ave, Los Angeles, CA", company="Tech Solutions"),
+        dict(name="Bob Johnson", email="bob@example.com", phone="+1122334455", address="789 Pine Rd, Chicago, IL", company="Global Industries"),
+    ]
+    users_data = [
+        dict(
+            username="admin",
+            email="admin@example.com",
+            password_hash=hash_password("admin123"),
+            full_name="Admin User",
+            role="admin",
+            is_active=True
+        ),
+        dict(
+            username="manager",
+            email="manager@example.com",
+            password_hash=hash_password("manager123"),
+            full_name="Manager User",
+            role="manager",
+            is_active=True
+        ),
+        dict(
+            username="johndoe",
+            email="john.user@example.com",
+            password_hash=hash_password("password123"),
+            full_name="John Doe",
+            role="user",
+            is_active=True
+        ),
+    ]
+
+    statements = [
+        insert(MetaModel).values(key="seeded", value="1"),
+        insert(ProductModel).values(products_data),
+        insert(CustomerModel).values(customers_data),
+        insert(UserModel).values(users_data),
+    ]
+    lines = ["BEGIN;"]
+    for stmt in statements:
+        compiled = stmt.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True})
+        lines.append(f"{compiled};")
+    lines.append("COMMIT;")
+    return "\n".join(lines) + "\n"
+
+
+def write_seed_dump():
+    """Regenerate app/seed.sql.gz (run after changing models or sample data)"""
+    with open(SEED_SQL_PATH, "wb") as f:
+        f.write(gzip.compress(build_seed_sql().encode(), mtime=0))
+    print(f"Seed dump written to: {SEED_SQL_PATH}")
+
+
+def write_template_db():
+    """Regenerate app/erp.seed.db: full schema plus the seed dump"""
+    if os.path.exists(TEMPLATE_DB_PATH):
+        os.remove(TEMPLATE_DB_PATH)
+
+    template_engine = create_engine(f"sqlite:///{TEMPLATE_DB_PATH}")
+    Base.metadata.create_all(bind=template_engine)
+    template_engine.dispose()
+
+    conn = sqlite3.connect(TEMPLATE_DB_PATH)
+    try:
+        conn.executescript(build_seed_sql())
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+    print(f"Template database written to: {TEMPLATE_DB_PATH}")
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -86,11 +158,20 @@ async def lifespan(app: FastAPI):
     """
     # Startup
     print("Starting ERP Inventory Manager API...")
+    if STATIC_POOL:
+        raise RuntimeError("DB_POOL=static shares one connection - scripts only, not the HTTP server")
+    if os.getenv("REGENERATE_SEED") == "1":
+        write_seed_dump()
+        write_template_db()
     init_db()
     seed_data()
     yield
     # Shutdown
     print("Shutting down...")
+    optimize_db()
+    checkpoint_db()
+    engine.dispose()  # Close pooled connections
+    await async_engine.dispose()
 
 
 app = FastAPI(
@@ -99,6 +180,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/api/docs",
     redoc_url="/api/redoc",
+    default_response_class=ORJSONResponse,  # orjson (Rust) instead of stdlib json
     lifespan=lifespan
 )
 
@@ -114,6 +196,22 @@ app.add_middleware(
     allow_headers=["*"],  # Allow all headers
 )
 
+# One DB session per request for the sync write endpoints
+app.add_middleware(SessionScopeMiddleware)
+
+
+# ============================================
+# Error responses - like @ControllerAdvice
+# FastAPI's default handler encodes with stdlib json; the structured
+# details from app/errors.py go through orjson like every other response
+# ============================================
+@app.exception_handler(StarletteHTTPException)
+async def http_exception_handler(request, exc: StarletteHTTPException):
+    headers = getattr(exc, "headers", None)
+    if not is_body_allowed_for_status_code(exc.status_code):  # 1xx, 204, 205, 304
+        return Response(status_code=exc.status_code, headers=headers)
+    return ORJSONResponse({"detail": exc.detail}, status_code=exc.status_code, headers=headers)
+
 # Include routers
 app.include_router(auth.router, prefix="/api", tags=["Authentication"])  # Auth first!
 app.include_router(products.router, prefix="/api", tags=["Products"])
@@ -7,6 +7,7 @@ from .user import User, UserCreate, UserUpdate
 from .product_model import ProductModel
 from .customer_model import CustomerModel
 from .user_model import UserModel
+from .meta_model import MetaModel
 
 __all__ = [
     # Pydantic
@@ -14,5 +15,5 @@ __all__ = [
     "Customer", "CustomerCreate", "CustomerUpdate",
     "User", "UserCreate", "UserUpdate",
     # SQLAlchemy
-    "ProductModel", "CustomerModel", "UserModel",
+    "ProductModel", "CustomerModel", "UserModel", "MetaModel",
 ]
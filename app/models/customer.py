@@ -1,6 +1,8 @@
 from pydantic import BaseModel, Field, EmailStr
 from typing import Optional
 
+from app.models.validators import not_null
+
 
 class CustomerBase(BaseModel):
     """Base Customer schema - shared fields"""
@@ -24,6 +26,8 @@ class CustomerUpdate(BaseModel):
     address: Optional[str] = Field(None, max_length=200)
     company: Optional[str] = Field(None, max_length=100)
 
+    _not_null = not_null("name", "email")
+
 
 class Customer(CustomerBase):
     """Customer schema with ID - returned from API"""
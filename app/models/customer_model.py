@@ -36,8 +36,8 @@ class CustomerModel(Base):
     """
     __tablename__ = "customers"
 
-    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
-    name = Column(String(100), nullable=False)
+    id = Column(Integer, primary_key=True, autoincrement=True)  # rowid alias - already indexed
+    name = Column(String(100), nullable=False, index=True)
     email = Column(String(100), nullable=False, unique=True)
     phone = Column(String(20), nullable=True)
     address = Column(String(200), nullable=True)
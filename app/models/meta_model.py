@@ -0,0 +1,29 @@
+# ============================================
+# META DATABASE MODEL (SQLAlchemy)
+# Key/value table for application bookkeeping
+# ============================================
+
+from sqlalchemy import Column, String
+from app.database import Base
+
+
+class MetaModel(Base):
+    """
+    Internal key/value settings (e.g. "seeded" marker)
+
+    JAVA EQUIVALENT:
+    @Entity
+    @Table(name = "_meta")
+    public class Meta {
+        @Id
+        @Column(length = 50)
+        private String key;
+
+        @Column(length = 200)
+        private String value;
+    }
+    """
+    __tablename__ = "_meta"
+
+    key = Column(String(50), primary_key=True)
+    value = Column(String(200), nullable=True)
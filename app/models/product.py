@@ -1,6 +1,8 @@
 from pydantic import BaseModel, Field
 from typing import Optional
 
+from app.models.validators import not_null
+
 
 class ProductBase(BaseModel):
     """Base Product schema - shared fields"""
@@ -24,6 +26,8 @@ class ProductUpdate(BaseModel):
     stock: Optional[int] = Field(None, ge=0)
     category: Optional[str] = Field(None, max_length=50)
 
+    _not_null = not_null("name", "price", "stock")
+
 
 class Product(ProductBase):
     """Product schema with ID - returned from API"""
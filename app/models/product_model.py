@@ -36,7 +36,7 @@ class ProductModel(Base):
     """
     __tablename__ = "products"
 
-    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)  # rowid alias - already indexed
     name = Column(String(100), nullable=False)
     description = Column(String(500), nullable=True)
     price = Column(Float, nullable=False)
@@ -2,6 +2,8 @@ from pydantic import BaseModel, Field, EmailStr
 from typing import Optional
 from datetime import datetime
 
+from app.models.validators import not_null
+
 
 class UserBase(BaseModel):
     """Base User schema - shared fields"""
@@ -30,6 +32,8 @@ class UserUpdate(BaseModel):
     is_active: Optional[bool] = None
     role: Optional[str] = Field(None, max_length=20)
 
+    _not_null = not_null("username", "email", "password", "is_active", "role")
+
 
 class User(UserBase):
     """User schema with ID - returned from API (password excluded)"""
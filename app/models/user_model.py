@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Index
 from sqlalchemy.sql import func
 from app.database import Base
 
@@ -9,7 +9,9 @@ class UserModel(Base):
 
     JAVA EQUIVALENT:
     @Entity
-    @Table(name = "users")
+    @Table(name = "users", indexes = {
+        @Index(name = "ix_users_username_active", columnList = "username, is_active")
+    })
     public class User {
         @Id
         @GeneratedValue(strategy = GenerationType.IDENTITY)
@@ -39,8 +41,12 @@ class UserModel(Base):
     }
     """
     __tablename__ = "users"
+    __table_args__ = (
+        # Login looks up by username and rejects inactive accounts
+        Index("ix_users_username_active", "username", "is_active"),
+    )
 
-    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    id = Column(Integer, primary_key=True, autoincrement=True)  # rowid alias - already indexed
     username = Column(String(50), unique=True, nullable=False, index=True)
     email = Column(String(100), unique=True, nullable=False, index=True)
     password_hash = Column(String(255), nullable=False)  # Stores hashed password
@@ -0,0 +1,21 @@
+from pydantic import field_validator
+
+
+def _reject_null(cls, value):
+    if value is None:
+        raise ValueError("may be omitted but not null")
+    return value
+
+
+def not_null(*fields: str):
+    """
+    Validator for update schemas: the fields may be omitted (kept as is)
+    but not sent as null - their columns are NOT NULL.
+
+    Usage (in the class body):
+    _not_null = not_null("name", "price")
+
+    JAVA EQUIVALENT:
+    @NotNull on the DTO fields, checked only when present
+    """
+    return field_validator(*fields, mode="before")(_reject_null)
@@ -0,0 +1,178 @@
+# ============================================
+# QUERY HELPERS (Repository layer)
+# Like Spring Data's JpaRepository + @EntityGraph
+# ============================================
+#
+# Loading strategy for relationships (avoid N+1 queries):
+# - Declare relationships with lazy="raise_on_sql", e.g.
+#       customer = relationship("CustomerModel", lazy="raise_on_sql")
+#   so a missing eager load raises instead of silently firing
+#   one SELECT per row.
+# - List queries pass selectinload(...) options: one extra
+#   "SELECT ... WHERE id IN (...)" per relationship, any row count.
+# - Use joinedload(...) only for many-to-one; one-to-many joins
+#   multiply the result rows.
+# - Single-row GETs go through get_with(...) with the same options:
+#   the response schema (and the GET /{id} cache snapshot) reads
+#   every relationship, so it has to be loaded before serializing.
+
+from functools import lru_cache
+from typing import Optional
+
+from sqlalchemy import bindparam, delete, insert, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+# Page size for list endpoints (like Spring Data's @PageableDefault)
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Rows accepted by one POST /bulk request
+MAX_BULK_SIZE = 1000
+
+# Users are capped far lower: each row is one bcrypt hash (~0.2 s at
+# the default cost 12), so 20 rows already hold a worker for ~4 s
+MAX_USER_BULK_SIZE = 20
+
+
+async def list_with(
+    db: AsyncSession,
+    model,
+    *options,
+    limit: Optional[int] = None,
+    after: Optional[int] = None,
+) -> list:
+    """
+    Fetch rows of a model in id order with loader options applied (async read path).
+    Keyset pagination: pass the last id of the previous page as `after` -
+    an index seek on the primary key, unlike OFFSET which scans skipped rows.
+
+    JAVA EQUIVALENT:
+    @EntityGraph(attributePaths = {"customer", "items"})
+    List<Order> findAll();
+
+    Example:
+    await list_with(db, OrderModel, selectinload(OrderModel.items).selectinload(ItemModel.product))
+    """
+    stmt = select(model).options(*options).order_by(model.id)
+    if after is not None:
+        stmt = stmt.where(model.id > after)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return (await db.scalars(stmt)).all()
+
+
+async def get_with(db: AsyncSession, model, pk: int, *options):
+    """
+    Fetch one row by id with loader options applied (async read path).
+    Returns None when no row has that id.
+
+    JAVA EQUIVALENT:
+    @EntityGraph(attributePaths = {"customer", "items"})
+    Optional<Order> findById(Long id);
+
+    Example:
+    await get_with(db, OrderModel, order_id, selectinload(OrderModel.items))
+    """
+    return await db.get(model, pk, options=options)
+
+
+def insert_returning(db: Session, model, values: dict):
+    """
+    INSERT one row and load it back, server defaults included
+    (INSERT ... RETURNING - no refresh SELECT afterwards).
+    Raises IntegrityError on a constraint violation.
+
+    JAVA EQUIVALENT:
+    productRepository.save(product);
+    """
+    stmt = insert(model).values(**values).returning(model)
+    return db.scalars(stmt).one()
+
+
+def insert_unique(db: Session, model, values: dict):
+    """
+    INSERT a row unless it collides with a unique constraint, returning it
+    in the same statement (INSERT ... ON CONFLICT DO NOTHING RETURNING).
+    Returns None on a duplicate (transaction rolled back) - no SELECT
+    pre-check, no race window.
+
+    JAVA EQUIVALENT:
+    @Modifying @Query(value = "INSERT ... ON CONFLICT DO NOTHING", nativeQuery = true)
+    """
+    stmt = sqlite_insert(model).values(**values).on_conflict_do_nothing().returning(model)
+    return _or_rollback(db, db.scalars(stmt).one_or_none())
+
+
+def insert_many(db: Session, model, rows: list) -> list:
+    """
+    INSERT many rows and load them back in as few statements as possible
+    (SQLAlchemy 2.0 "insertmanyvalues": multi-row INSERT ... RETURNING).
+
+    JAVA EQUIVALENT:
+    productRepository.saveAll(products);  // with hibernate.jdbc.batch_size
+    """
+    # sort_by_parameter_order=True would fall back to one INSERT per row on
+    # SQLite. Ids are assigned in VALUES order, RETURNING order is not
+    # guaranteed - sorting by id gives back the input order.
+    stmt = insert(model).returning(model)
+    return sorted(db.scalars(stmt, rows).all(), key=lambda row: row.id)
+
+
+def update_returning(db: Session, model, pk: int, values: dict):
+    """
+    UPDATE one row by id and load it back in the same statement
+    (UPDATE ... RETURNING). Returns None when no row has that id,
+    after rolling the transaction back.
+
+    JAVA EQUIVALENT:
+    @Modifying @Query("UPDATE Product p SET ... WHERE p.id = :id")
+    """
+    if not values:
+        return _or_rollback(db, db.get(model, pk))
+    stmt = update(model).where(model.id == pk).values(**values).returning(model)
+    return _or_rollback(db, db.scalars(stmt).one_or_none())
+
+
+def delete_returning(db: Session, model, pk: int) -> bool:
+    """
+    DELETE one row by id without loading it first (DELETE ... RETURNING id).
+    Returns False when no row has that id, after rolling back.
+
+    JAVA EQUIVALENT:
+    @Modifying @Query("DELETE FROM Product p WHERE p.id = :id")
+    """
+    return _or_rollback(db, db.scalar(_delete_by_id(model), {"pk": pk})) is not None
+
+
+def _or_rollback(db: Session, row):
+    # A miss means the caller raises 404/400 next - end the transaction
+    # here, in the worker thread, so the SQLite write lock is released
+    # before the response instead of when the middleware closes the session
+    if row is None:
+        db.rollback()
+    return row
+
+
+@lru_cache(maxsize=None)
+def _delete_by_id(model):
+    # Built once per model with a bound :pk - skips rebuilding the
+    # statement and its compiled-cache key on every DELETE
+    return delete(model).where(model.id == bindparam("pk")).returning(model.id)
+
+
+def unique_violation(error: IntegrityError) -> Optional[str]:
+    """
+    Column named by a UNIQUE constraint failure, or None for other errors.
+    SQLite reports "UNIQUE constraint failed: users.email" -> "email".
+
+    JAVA EQUIVALENT:
+    ((ConstraintViolationException) e.getCause()).getConstraintName()
+    """
+    message = str(error.orig)
+    prefix = "UNIQUE constraint failed: "
+    if not message.startswith(prefix):
+        return None
+    return message[len(prefix):].split(",")[0].split(".")[-1]
@@ -0,0 +1,23 @@
+# ============================================
+# JSON RESPONSE HELPERS
+# Like a custom HttpMessageConverter in Spring
+# ============================================
+
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+
+
+def orm_json_response(adapter: TypeAdapter, value, status_code: int = 200) -> Response:
+    """
+    Validate ORM object(s) and render JSON with pydantic-core in one go.
+
+    Returning a Response makes FastAPI skip its own response_model pass
+    (validate -> dump to dicts -> JSON encode), which is done per row in
+    Python. Keep response_model on the route for the OpenAPI docs.
+    """
+    data = adapter.validate_python(value, from_attributes=True)
+    return Response(
+        content=adapter.dump_json(data),
+        status_code=status_code,
+        media_type="application/json"
+    )
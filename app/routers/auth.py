@@ -4,15 +4,27 @@
 # ============================================
 
 from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from pydantic import BaseModel
-from datetime import datetime, timedelta
+from sqlalchemy import bindparam, lambda_stmt, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import BaseModel, TypeAdapter
+from typing import Optional
+from datetime import datetime
+from threading import Lock
+from cachetools import TTLCache
+from passlib.context import CryptContext
+import base64
 import hashlib
+import hmac
+import os
+import time
 import jwt
+import orjson
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models.user_model import UserModel
+from app.responses import orm_json_response
 
 router = APIRouter()
 
@@ -24,9 +36,29 @@ router = APIRouter()
 SECRET_KEY = "your-secret-key-change-in-production"  # Like application.properties
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24  # 24 hours
+ACCESS_TOKEN_EXPIRE_SECONDS = ACCESS_TOKEN_EXPIRE_MINUTES * 60
+
+# Encode the key once instead of on every jwt.encode call
+_SECRET_BYTES = SECRET_KEY.encode()
 
 security = HTTPBearer()
 
+# Password encoder (like Spring's DelegatingPasswordEncoder).
+# New hashes are bcrypt; legacy SHA-256 hex hashes still verify and
+# (deprecated="auto") are replaced with bcrypt on the next login.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+pwd_context = CryptContext(
+    schemes=["bcrypt", "hex_sha256"],
+    deprecated="auto",
+    bcrypt__rounds=BCRYPT_ROUNDS,
+)
+
+# Process-local cache of authenticated users (like a Caffeine cache)
+# Keyed by user id; the short TTL bounds staleness across workers.
+USER_CACHE_TTL_SECONDS = 60
+_user_cache = TTLCache(maxsize=10_000, ttl=USER_CACHE_TTL_SECONDS)
+_user_cache_lock = Lock()  # TTLCache is not thread-safe
+
 
 # ============================================
 # SCHEMAS (DTOs in Java)
@@ -38,11 +70,24 @@ class LoginRequest(BaseModel):
     password: str
 
 
+class CurrentUser(BaseModel):
+    """Snapshot of the authenticated user (safe to cache across requests)"""
+    id: int
+    username: str
+    email: str
+    full_name: Optional[str] = None
+    role: str
+    is_active: bool
+
+    class Config:
+        from_attributes = True
+
+
 class LoginResponse(BaseModel):
     """Login response with token"""
     access_token: str
     token_type: str = "bearer"
-    user: dict  # User info (without password)
+    user: CurrentUser  # User info (without password)
 
 
 class TokenPayload(BaseModel):
@@ -53,13 +98,52 @@ class TokenPayload(BaseModel):
     exp: datetime
 
 
+_login_response_adapter = TypeAdapter(LoginResponse)
+
+# Login lookup built once: lambda_stmt caches the statement and its
+# cache key by code location, so a login skips rebuilding the SELECT
+_user_by_username = lambda_stmt(
+    lambda: select(UserModel).where(UserModel.username == bindparam("username"))
+)
+
+
 # ============================================
 # HELPER FUNCTIONS
 # ============================================
 
 def hash_password(password: str) -> str:
-    """Hash password with SHA-256"""
-    return hashlib.sha256(password.encode()).hexdigest()
+    """
+    Hash a password with bcrypt (cost from BCRYPT_ROUNDS).
+    CPU-bound: the user endpoints are sync `def`, so it already runs in
+    FastAPI's threadpool; an async caller must use run_in_threadpool.
+
+    JAVA EQUIVALENT:
+    passwordEncoder.encode(rawPassword)
+    """
+    return pwd_context.hash(password)
+
+
+def verify_password(password: str, password_hash: Optional[str]) -> tuple[bool, Optional[str]]:
+    """
+    Check a password against its stored hash (constant-time compare).
+    Returns (valid, new_hash) - new_hash is set when the stored hash uses
+    a deprecated scheme and should be replaced.
+
+    Pass None for an unknown user: a dummy bcrypt verify still runs, so
+    a missing username costs as long as a wrong password. A failed
+    legacy hash pays for one too.
+
+    JAVA EQUIVALENT:
+    passwordEncoder.matches(rawPassword, encodedPassword)
+    passwordEncoder.upgradeEncoding(encodedPassword)
+    """
+    if password_hash is None:
+        pwd_context.dummy_verify()
+        return False, None
+    valid, new_hash = pwd_context.verify_and_update(password, password_hash)
+    if not valid and pwd_context.needs_update(password_hash):
+        pwd_context.dummy_verify()
+    return valid, new_hash
 
 
 def create_access_token(user: UserModel) -> str:
@@ -77,7 +161,8 @@ def create_access_token(user: UserModel) -> str:
             .compact();
     }
     """
-    expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    # Unix timestamp - PyJWT uses an int "exp" as-is (no datetime conversion)
+    expire = int(time.time()) + ACCESS_TOKEN_EXPIRE_SECONDS
     
     payload = {
         "sub": str(user.id),      # User ID as subject
@@ -86,12 +171,43 @@ def create_access_token(user: UserModel) -> str:
         "exp": expire
     }
     
-    return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
+    return jwt.encode(payload, _SECRET_BYTES, algorithm=ALGORITHM)
+
+
+def _b64url_decode(segment: bytes) -> bytes:
+    """Decode an unpadded base64url JWT segment"""
+    return base64.urlsafe_b64decode(segment + b"=" * (-len(segment) % 4))
+
+
+def _decode_hs256(token: str) -> dict:
+    """
+    Check the HS256 signature and return the claims.
+    Raises ValueError for anything that is not a token we minted.
+    """
+    header_b64, payload_b64, signature_b64 = token.encode("ascii").split(b".")
+
+    # hmac/hashlib run on OpenSSL, which picks SHA-NI at runtime where the
+    # CPU has it - no special build needed (~1 us per token)
+    expected = hmac.new(_SECRET_BYTES, header_b64 + b"." + payload_b64, hashlib.sha256).digest()
+    if not hmac.compare_digest(_b64url_decode(signature_b64), expected):
+        raise ValueError("Signature mismatch")
+
+    header = orjson.loads(_b64url_decode(header_b64))
+    payload = orjson.loads(_b64url_decode(payload_b64))
+    if not isinstance(header, dict) or header.get("alg") != ALGORITHM:
+        raise ValueError("Unexpected algorithm")
+    if not isinstance(payload, dict) or not isinstance(payload.get("exp"), int):
+        raise ValueError("Missing exp claim")
+    return payload
 
 
 def verify_token(token: str) -> dict:
     """
     Verify and decode JWT token
+
+    Runs on every authenticated request, so instead of jwt.decode()
+    it checks the HMAC directly (stdlib hmac -> OpenSSL) and only
+    validates the claims create_access_token() sets.
     
     JAVA EQUIVALENT:
     public Claims verifyToken(String token) {
@@ -102,31 +218,44 @@ def verify_token(token: str) -> dict:
     }
     """
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
-    except jwt.ExpiredSignatureError:
+        payload = _decode_hs256(token)
+    except ValueError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Token has expired"
+            detail="Invalid token"
         )
-    except jwt.InvalidTokenError:
+
+    if payload["exp"] <= time.time():
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token"
+            detail="Token has expired"
         )
 
+    return payload
+
+
+def invalidate_cached_user(user_id: int) -> None:
+    """
+    Drop a user from the auth cache - call after updating/deleting a user
+
+    JAVA EQUIVALENT:
+    @CacheEvict(value = "users", key = "#userId")
+    """
+    with _user_cache_lock:
+        _user_cache.pop(user_id, None)
+
 
 # ============================================
 # DEPENDENCY - Get Current User from Token
 # Like @AuthenticationPrincipal in Spring
 # ============================================
 
-def get_current_user(
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> UserModel:
+    db: AsyncSession = Depends(get_async_db)
+) -> CurrentUser:
     """
-    Extract user from JWT token
+    Extract user from JWT token (cached per user id for a short TTL)
     
     JAVA EQUIVALENT:
     public User getCurrentUser(@AuthenticationPrincipal UserDetails userDetails) {
@@ -138,13 +267,21 @@ def get_current_user(
     payload = verify_token(token)
     
     user_id = int(payload["sub"])
-    user = db.query(UserModel).filter(UserModel.id == user_id).first()
-    
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found"
-        )
+    with _user_cache_lock:
+        user = _user_cache.get(user_id)
+
+    if user is None:
+        db_user = await db.get(UserModel, user_id)  # Like entityManager.find(User.class, id)
+
+        if not db_user:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found"
+            )
+
+        user = CurrentUser.model_validate(db_user)
+        with _user_cache_lock:
+            _user_cache[user_id] = user
     
     if not user.is_active:
         raise HTTPException(
@@ -160,7 +297,7 @@ def get_current_user(
 # ============================================
 
 @router.post("/auth/login", response_model=LoginResponse)
-def login(request: LoginRequest, db: Session = Depends(get_db)):
+async def login(request: LoginRequest, db: AsyncSession = Depends(get_async_db)):
     """
     Authenticate user and return JWT token
     
@@ -179,20 +316,15 @@ def login(request: LoginRequest, db: Session = Depends(get_db)):
     }
     """
     # Find user by username
-    user = db.query(UserModel).filter(
-        UserModel.username == request.username
-    ).first()
+    user = await db.scalar(_user_by_username, {"username": request.username})
     
-    # Check if user exists
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid username or password"
-        )
-    
-    # Verify password
-    password_hash = hash_password(request.password)
-    if user.password_hash != password_hash:
+    # Verify password on a worker thread - login is async, and a slow
+    # (bcrypt/argon2) hash must not block the event loop. An unknown
+    # username runs a dummy verify, so timing doesn't reveal which exist.
+    valid, new_hash = await run_in_threadpool(
+        verify_password, request.password, user.password_hash if user else None
+    )
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid username or password"
@@ -205,25 +337,23 @@ def login(request: LoginRequest, db: Session = Depends(get_db)):
             detail="User account is inactive"
         )
     
+    # Upgrade a legacy (SHA-256) hash now that we know the password
+    if new_hash:
+        await db.execute(
+            update(UserModel).where(UserModel.id == user.id).values(password_hash=new_hash)
+        )
+        await db.commit()
+    
     # Create JWT token
     token = create_access_token(user)
     
-    # Return token and user info
-    return LoginResponse(
-        access_token=token,
-        user={
-            "id": user.id,
-            "username": user.username,
-            "email": user.email,
-            "full_name": user.full_name,
-            "role": user.role,
-            "is_active": user.is_active
-        }
-    )
+    # Return token and user info - the ORM user is read straight into
+    # CurrentUser and rendered as JSON in one pydantic-core pass
+    return orm_json_response(_login_response_adapter, {"access_token": token, "user": user})
 
 
 @router.get("/auth/me")
-def get_me(current_user: UserModel = Depends(get_current_user)):
+async def get_me(current_user: CurrentUser = Depends(get_current_user)):
     """
     Get current authenticated user
     
@@ -1,30 +1,51 @@
-from fastapi import APIRouter, HTTPException, status, Depends
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Body, status, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
+from typing import List, Optional
+from pydantic import TypeAdapter
 
-from app.database import get_db
+from app.database import ScopedSession, get_async_db
 from app.models.customer_model import CustomerModel
 from app.models.customer import Customer, CustomerCreate, CustomerUpdate
+from app.errors import not_found, already_exists, integrity_error
+from app.cache import cache_version, get_cached, put_cached, evict_cached
+from app.repo import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, MAX_BULK_SIZE, list_with, get_with, insert_many, insert_unique, update_returning, delete_returning
+from app.responses import orm_json_response
 
 router = APIRouter()
 
+# Validate + serialize responses (lists and single rows) in one pydantic-core call
+_customers_adapter = TypeAdapter(List[Customer])
+_customer_adapter = TypeAdapter(Customer)
+
+# Request bodies -> dicts without the per-call model_dump() wrapper
+_customer_create_adapter = TypeAdapter(CustomerCreate)
+_customers_create_adapter = TypeAdapter(List[CustomerCreate])
+_customer_update_adapter = TypeAdapter(CustomerUpdate)
+
 
 @router.get("/customers", response_model=List[Customer])
-def get_all_customers(db: Session = Depends(get_db)):
+async def get_all_customers(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[int] = Query(None, description="Last id of the previous page"),
+    db: AsyncSession = Depends(get_async_db)
+):
     """
-    Get all customers from database
+    Get customers from database, one page at a time (ordered by id).
+    For the next page pass the last returned id as `cursor`.
     
     JAVA EQUIVALENT:
     @GetMapping("/customers")
-    public List<Customer> getAllCustomers() {
-        return customerRepository.findAll();
+    public List<Customer> getAllCustomers(@RequestParam Long cursor, Pageable pageable) {
+        return customerRepository.findByIdGreaterThan(cursor, pageable);
     }
     """
-    return db.query(CustomerModel).all()
+    customers = await list_with(db, CustomerModel, limit=limit, after=cursor)
+    return orm_json_response(_customers_adapter, customers)
 
 
 @router.get("/customers/{customer_id}", response_model=Customer)
-def get_customer(customer_id: int, db: Session = Depends(get_db)):
+async def get_customer(customer_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     Get a single customer by ID
     
@@ -35,17 +56,20 @@ def get_customer(customer_id: int, db: Session = Depends(get_db)):
             .orElseThrow(() -> new NotFoundException("Customer not found"));
     }
     """
-    customer = db.query(CustomerModel).filter(CustomerModel.id == customer_id).first()
-    if not customer:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Customer with id {customer_id} not found"
-        )
-    return customer
+    customer = get_cached(CustomerModel, customer_id)
+    if customer is None:
+        version = cache_version(CustomerModel, customer_id)
+        db_customer = await get_with(db, CustomerModel, customer_id)
+        if not db_customer:
+            raise not_found("Customer", customer_id)
+
+        customer = Customer.model_validate(db_customer)
+        put_cached(CustomerModel, customer_id, customer, version)
+    return orm_json_response(_customer_adapter, customer)
 
 
 @router.post("/customers", response_model=Customer, status_code=status.HTTP_201_CREATED)
-def create_customer(customer: CustomerCreate, db: Session = Depends(get_db)):
+def create_customer(customer: CustomerCreate):
     """
     Create a new customer
     
@@ -61,23 +85,42 @@ def create_customer(customer: CustomerCreate, db: Session = Depends(get_db)):
         return customerRepository.save(customer);
     }
     """
-    # Check if email already exists
-    existing = db.query(CustomerModel).filter(CustomerModel.email == customer.email).first()
-    if existing:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Customer with email {customer.email} already exists"
-        )
-
-    db_customer = CustomerModel(**customer.model_dump())
-    db.add(db_customer)
+    db = ScopedSession()
+    # Insert unless the email already exists (email is the only unique column)
+    db_customer = insert_unique(db, CustomerModel, _customer_create_adapter.dump_python(customer))
+    if not db_customer:
+        raise already_exists("Customer", "email", customer.email)
+
     db.commit()
-    db.refresh(db_customer)
-    return db_customer
+    return orm_json_response(_customer_adapter, db_customer, status_code=status.HTTP_201_CREATED)
+
+
+@router.post("/customers/bulk", response_model=List[Customer], status_code=status.HTTP_201_CREATED)
+def create_customers_bulk(
+    customers: List[CustomerCreate] = Body(..., min_length=1, max_length=MAX_BULK_SIZE)
+):
+    """
+    Create many customers in one request - all or nothing
+
+    JAVA EQUIVALENT:
+    @PostMapping("/customers/bulk")
+    @Transactional
+    public List<Customer> createCustomers(@RequestBody List<CustomerDTO> dtos) {
+        return customerRepository.saveAll(dtos.stream().map(Customer::from).toList());
+    }
+    """
+    db = ScopedSession()
+    try:
+        db_customers = insert_many(db, CustomerModel, _customers_create_adapter.dump_python(customers))
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        raise integrity_error("Customer", e)
+    return orm_json_response(_customers_adapter, db_customers, status_code=status.HTTP_201_CREATED)
 
 
 @router.put("/customers/{customer_id}", response_model=Customer)
-def update_customer(customer_id: int, customer_update: CustomerUpdate, db: Session = Depends(get_db)):
+def update_customer(customer_id: int, customer_update: CustomerUpdate):
     """
     Update an existing customer
     
@@ -96,38 +139,26 @@ def update_customer(customer_id: int, customer_update: CustomerUpdate, db: Sessi
         return customerRepository.save(customer);
     }
     """
-    db_customer = db.query(CustomerModel).filter(CustomerModel.id == customer_id).first()
-    
+    db = ScopedSession()
+    # Update only provided fields (one UPDATE ... RETURNING round-trip);
+    # the UNIQUE constraint on email rejects duplicates
+    update_data = _customer_update_adapter.dump_python(customer_update, exclude_unset=True)
+    try:
+        db_customer = update_returning(db, CustomerModel, customer_id, update_data)
+    except IntegrityError as e:
+        db.rollback()
+        raise integrity_error("Customer", e, update_data)
+
     if not db_customer:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Customer with id {customer_id} not found"
-        )
-
-    # Check if email is being updated and already exists
-    update_data = customer_update.model_dump(exclude_unset=True)
-    if "email" in update_data and update_data["email"] != db_customer.email:
-        email_exists = db.query(CustomerModel).filter(
-            CustomerModel.email == update_data["email"],
-            CustomerModel.id != customer_id
-        ).first()
-        if email_exists:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Customer with email {update_data['email']} already exists"
-            )
-
-    # Update only provided fields
-    for field, value in update_data.items():
-        setattr(db_customer, field, value)
-    
+        raise not_found("Customer", customer_id)
+
     db.commit()
-    db.refresh(db_customer)
-    return db_customer
+    evict_cached(CustomerModel, customer_id)
+    return orm_json_response(_customer_adapter, db_customer)
 
 
 @router.delete("/customers/{customer_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_customer(customer_id: int, db: Session = Depends(get_db)):
+def delete_customer(customer_id: int):
     """
     Delete a customer
     
@@ -139,14 +170,10 @@ def delete_customer(customer_id: int, db: Session = Depends(get_db)):
         customerRepository.delete(customer);
     }
     """
-    db_customer = db.query(CustomerModel).filter(CustomerModel.id == customer_id).first()
-    
-    if not db_customer:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Customer with id {customer_id} not found"
-        )
-    
-    db.delete(db_customer)
+    db = ScopedSession()
+    if not delete_returning(db, CustomerModel, customer_id):
+        raise not_found("Customer", customer_id)
+
     db.commit()
+    evict_cached(CustomerModel, customer_id)
     return None
@@ -1,30 +1,50 @@
-from fastapi import APIRouter, HTTPException, status, Depends
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Body, status, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from pydantic import TypeAdapter
 
-from app.database import get_db
+from app.database import ScopedSession, get_async_db
 from app.models.product_model import ProductModel
 from app.models.product import Product, ProductCreate, ProductUpdate
+from app.errors import not_found
+from app.cache import cache_version, get_cached, put_cached, evict_cached
+from app.repo import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, MAX_BULK_SIZE, list_with, get_with, insert_many, insert_returning, update_returning, delete_returning
+from app.responses import orm_json_response
 
 router = APIRouter()
 
+# Validate + serialize responses (lists and single rows) in one pydantic-core call
+_products_adapter = TypeAdapter(List[Product])
+_product_adapter = TypeAdapter(Product)
+
+# Request bodies -> dicts without the per-call model_dump() wrapper
+_product_create_adapter = TypeAdapter(ProductCreate)
+_products_create_adapter = TypeAdapter(List[ProductCreate])
+_product_update_adapter = TypeAdapter(ProductUpdate)
+
 
 @router.get("/products", response_model=List[Product])
-def get_all_products(db: Session = Depends(get_db)):
+async def get_all_products(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[int] = Query(None, description="Last id of the previous page"),
+    db: AsyncSession = Depends(get_async_db)
+):
     """
-    Get all products from database
+    Get products from database, one page at a time (ordered by id).
+    For the next page pass the last returned id as `cursor`.
     
     JAVA EQUIVALENT:
     @GetMapping("/products")
-    public List<Product> getAllProducts() {
-        return productRepository.findAll();
+    public List<Product> getAllProducts(@RequestParam Long cursor, Pageable pageable) {
+        return productRepository.findByIdGreaterThan(cursor, pageable);
     }
     """
-    return db.query(ProductModel).all()
+    products = await list_with(db, ProductModel, limit=limit, after=cursor)
+    return orm_json_response(_products_adapter, products)
 
 
 @router.get("/products/{product_id}", response_model=Product)
-def get_product(product_id: int, db: Session = Depends(get_db)):
+async def get_product(product_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     Get a single product by ID
     
@@ -35,17 +55,20 @@ def get_product(product_id: int, db: Session = Depends(get_db)):
             .orElseThrow(() -> new NotFoundException("Product not found"));
     }
     """
-    product = db.query(ProductModel).filter(ProductModel.id == product_id).first()
-    if not product:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Product with id {product_id} not found"
-        )
-    return product
+    product = get_cached(ProductModel, product_id)
+    if product is None:
+        version = cache_version(ProductModel, product_id)
+        db_product = await get_with(db, ProductModel, product_id)
+        if not db_product:
+            raise not_found("Product", product_id)
+
+        product = Product.model_validate(db_product)
+        put_cached(ProductModel, product_id, product, version)
+    return orm_json_response(_product_adapter, product)
 
 
 @router.post("/products", response_model=Product, status_code=status.HTTP_201_CREATED)
-def create_product(product: ProductCreate, db: Session = Depends(get_db)):
+def create_product(product: ProductCreate):
     """
     Create a new product
     
@@ -57,15 +80,34 @@ def create_product(product: ProductCreate, db: Session = Depends(get_db)):
         return productRepository.save(product);
     }
     """
-    db_product = ProductModel(**product.model_dump())
-    db.add(db_product)
+    db = ScopedSession()
+    # INSERT ... RETURNING brings back the generated id - no refresh SELECT
+    db_product = insert_returning(db, ProductModel, _product_create_adapter.dump_python(product))
     db.commit()
-    db.refresh(db_product)  # Get the generated ID
-    return db_product
+    return orm_json_response(_product_adapter, db_product, status_code=status.HTTP_201_CREATED)
+
+
+@router.post("/products/bulk", response_model=List[Product], status_code=status.HTTP_201_CREATED)
+def create_products_bulk(
+    products: List[ProductCreate] = Body(..., min_length=1, max_length=MAX_BULK_SIZE)
+):
+    """
+    Create many products in one request (one transaction)
+
+    JAVA EQUIVALENT:
+    @PostMapping("/products/bulk")
+    public List<Product> createProducts(@RequestBody List<ProductDTO> dtos) {
+        return productRepository.saveAll(dtos.stream().map(Product::from).toList());
+    }
+    """
+    db = ScopedSession()
+    db_products = insert_many(db, ProductModel, _products_create_adapter.dump_python(products))
+    db.commit()
+    return orm_json_response(_products_adapter, db_products, status_code=status.HTTP_201_CREATED)
 
 
 @router.put("/products/{product_id}", response_model=Product)
-def update_product(product_id: int, product_update: ProductUpdate, db: Session = Depends(get_db)):
+def update_product(product_id: int, product_update: ProductUpdate):
     """
     Update an existing product
     
@@ -78,26 +120,21 @@ def update_product(product_id: int, product_update: ProductUpdate, db: Session =
         return productRepository.save(product);
     }
     """
-    db_product = db.query(ProductModel).filter(ProductModel.id == product_id).first()
-    
+    db = ScopedSession()
+    # Update only provided fields (one UPDATE ... RETURNING round-trip)
+    update_data = _product_update_adapter.dump_python(product_update, exclude_unset=True)
+    db_product = update_returning(db, ProductModel, product_id, update_data)
+
     if not db_product:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Product with id {product_id} not found"
-        )
-
-    # Update only provided fields
-    update_data = product_update.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(db_product, field, value)
-    
+        raise not_found("Product", product_id)
+
     db.commit()
-    db.refresh(db_product)
-    return db_product
+    evict_cached(ProductModel, product_id)
+    return orm_json_response(_product_adapter, db_product)
 
 
 @router.delete("/products/{product_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_product(product_id: int, db: Session = Depends(get_db)):
+def delete_product(product_id: int):
     """
     Delete a product
     
@@ -109,14 +146,10 @@ def delete_product(product_id: int, db: Session = Depends(get_db)):
         productRepository.delete(product);
     }
     """
-    db_product = db.query(ProductModel).filter(ProductModel.id == product_id).first()
-    
-    if not db_product:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Product with id {product_id} not found"
-        )
-    
-    db.delete(db_product)
+    db = ScopedSession()
+    if not delete_returning(db, ProductModel, product_id):
+        raise not_found("Product", product_id)
+
     db.commit()
+    evict_cached(ProductModel, product_id)
     return None
@@ -1,44 +1,57 @@
-from fastapi import APIRouter, HTTPException, status, Depends
-from sqlalchemy.orm import Session
-from typing import List
-import hashlib
-
-from app.database import get_db
+from fastapi import APIRouter, Body, status, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import defer
+from typing import List, Optional
+from pydantic import TypeAdapter
+
+from app.database import ScopedSession, get_async_db
 from app.models.user_model import UserModel
 from app.models.user import User, UserCreate, UserUpdate
+from app.errors import not_found, integrity_error
+from app.cache import cache_version, get_cached, put_cached, evict_cached
+from app.repo import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, MAX_USER_BULK_SIZE, list_with, get_with, insert_many, insert_returning, update_returning, delete_returning
+from app.responses import orm_json_response
+from app.routers.auth import hash_password, invalidate_cached_user
 
 router = APIRouter()
 
+# Validate + serialize responses (lists and single rows) in one pydantic-core call
+_users_adapter = TypeAdapter(List[User])
+_user_adapter = TypeAdapter(User)
 
-def hash_password(password: str) -> str:
-    """
-    Simple password hashing (for learning purposes)
-    In production, use bcrypt or passlib
-
-    JAVA EQUIVALENT:
-    public String hashPassword(String password) {
-        return BCrypt.hashpw(password, BCrypt.gensalt());
-    }
-    """
-    return hashlib.sha256(password.encode()).hexdigest()
+# Request bodies -> dicts without the per-call model_dump() wrapper
+_user_create_adapter = TypeAdapter(UserCreate)
+_users_create_adapter = TypeAdapter(List[UserCreate])
+_user_update_adapter = TypeAdapter(UserUpdate)
 
 
 @router.get("/users", response_model=List[User])
-def get_all_users(db: Session = Depends(get_db)):
+async def get_all_users(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[int] = Query(None, description="Last id of the previous page"),
+    db: AsyncSession = Depends(get_async_db)
+):
     """
-    Get all users from database
+    Get users from database, one page at a time (ordered by id).
+    For the next page pass the last returned id as `cursor`.
 
     JAVA EQUIVALENT:
     @GetMapping("/users")
-    public List<User> getAllUsers() {
-        return userRepository.findAll();
+    public List<User> getAllUsers(@RequestParam Long cursor, Pageable pageable) {
+        return userRepository.findByIdGreaterThan(cursor, pageable);
     }
     """
-    return db.query(UserModel).all()
+    # The response never includes password_hash - don't SELECT it
+    users = await list_with(
+        db, UserModel, defer(UserModel.password_hash, raiseload=True),
+        limit=limit, after=cursor
+    )
+    return orm_json_response(_users_adapter, users)
 
 
 @router.get("/users/{user_id}", response_model=User)
-def get_user(user_id: int, db: Session = Depends(get_db)):
+async def get_user(user_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     Get a single user by ID
 
@@ -49,17 +62,20 @@ def get_user(user_id: int, db: Session = Depends(get_db)):
             .orElseThrow(() -> new NotFoundException("User not found"));
     }
     """
-    user = db.query(UserModel).filter(UserModel.id == user_id).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"User with id {user_id} not found"
-        )
-    return user
+    user = get_cached(UserModel, user_id)
+    if user is None:
+        version = cache_version(UserModel, user_id)
+        db_user = await get_with(db, UserModel, user_id)
+        if not db_user:
+            raise not_found("User", user_id)
+
+        user = User.model_validate(db_user)
+        put_cached(UserModel, user_id, user, version)
+    return orm_json_response(_user_adapter, user)
 
 
 @router.post("/users", response_model=User, status_code=status.HTTP_201_CREATED)
-def create_user(user: UserCreate, db: Session = Depends(get_db)):
+def create_user(user: UserCreate):
     """
     Create a new user
 
@@ -80,39 +96,53 @@ def create_user(user: UserCreate, db: Session = Depends(get_db)):
         return userRepository.save(user);
     }
     """
-    # Check if username already exists
-    existing_username = db.query(UserModel).filter(UserModel.username == user.username).first()
-    if existing_username:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Username '{user.username}' already exists"
-        )
+    db = ScopedSession()
+    # Create user with hashed password
+    user_data = _user_create_adapter.dump_python(user)
+    password = user_data.pop("password")  # Remove plain password
 
-    # Check if email already exists
-    existing_email = db.query(UserModel).filter(UserModel.email == user.email).first()
-    if existing_email:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Email '{user.email}' already exists"
+    # Let the UNIQUE constraints on username/email reject duplicates
+    try:
+        db_user = insert_returning(
+            db, UserModel, {**user_data, "password_hash": hash_password(password)}
         )
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        raise integrity_error("User", e, user_data)
+    return orm_json_response(_user_adapter, db_user, status_code=status.HTTP_201_CREATED)
 
-    # Create user with hashed password
-    user_data = user.model_dump()
-    password = user_data.pop("password")  # Remove plain password
 
-    db_user = UserModel(
-        **user_data,
-        password_hash=hash_password(password)
-    )
+@router.post("/users/bulk", response_model=List[User], status_code=status.HTTP_201_CREATED)
+def create_users_bulk(
+    users: List[UserCreate] = Body(..., min_length=1, max_length=MAX_USER_BULK_SIZE)
+):
+    """
+    Create many users in one request - all or nothing
 
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    return db_user
+    JAVA EQUIVALENT:
+    @PostMapping("/users/bulk")
+    @Transactional
+    public List<User> createUsers(@RequestBody List<UserDTO> dtos) {
+        return userRepository.saveAll(dtos.stream().map(User::from).toList());
+    }
+    """
+    db = ScopedSession()
+    rows = _users_create_adapter.dump_python(users)
+    for user_data in rows:
+        user_data["password_hash"] = hash_password(user_data.pop("password"))
+
+    try:
+        db_users = insert_many(db, UserModel, rows)
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        raise integrity_error("User", e)
+    return orm_json_response(_users_adapter, db_users, status_code=status.HTTP_201_CREATED)
 
 
 @router.put("/users/{user_id}", response_model=User)
-def update_user(user_id: int, user_update: UserUpdate, db: Session = Depends(get_db)):
+def update_user(user_id: int, user_update: UserUpdate):
     """
     Update an existing user
 
@@ -145,56 +175,33 @@ def update_user(user_id: int, user_update: UserUpdate, db: Session = Depends(get
         return userRepository.save(user);
     }
     """
-    db_user = db.query(UserModel).filter(UserModel.id == user_id).first()
-
-    if not db_user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"User with id {user_id} not found"
-        )
-
-    update_data = user_update.model_dump(exclude_unset=True)
-
-    # Check if username is being updated and already exists
-    if "username" in update_data and update_data["username"] != db_user.username:
-        username_exists = db.query(UserModel).filter(
-            UserModel.username == update_data["username"],
-            UserModel.id != user_id
-        ).first()
-        if username_exists:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Username '{update_data['username']}' already exists"
-            )
-
-    # Check if email is being updated and already exists
-    if "email" in update_data and update_data["email"] != db_user.email:
-        email_exists = db.query(UserModel).filter(
-            UserModel.email == update_data["email"],
-            UserModel.id != user_id
-        ).first()
-        if email_exists:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Email '{update_data['email']}' already exists"
-            )
+    db = ScopedSession()
+    update_data = _user_update_adapter.dump_python(user_update, exclude_unset=True)
 
     # Handle password update separately
     if "password" in update_data:
         password = update_data.pop("password")
         update_data["password_hash"] = hash_password(password)
 
-    # Update only provided fields
-    for field, value in update_data.items():
-        setattr(db_user, field, value)
+    # Update only provided fields (one UPDATE ... RETURNING round-trip);
+    # the UNIQUE constraints on username/email reject duplicates
+    try:
+        db_user = update_returning(db, UserModel, user_id, update_data)
+    except IntegrityError as e:
+        db.rollback()
+        raise integrity_error("User", e, update_data)
+
+    if not db_user:
+        raise not_found("User", user_id)
 
     db.commit()
-    db.refresh(db_user)
-    return db_user
+    evict_cached(UserModel, user_id)
+    invalidate_cached_user(user_id)
+    return orm_json_response(_user_adapter, db_user)
 
 
 @router.delete("/users/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_user(user_id: int, db: Session = Depends(get_db)):
+def delete_user(user_id: int):
     """
     Delete a user
 
@@ -206,14 +213,11 @@ def delete_user(user_id: int, db: Session = Depends(get_db)):
         userRepository.delete(user);
     }
     """
-    db_user = db.query(UserModel).filter(UserModel.id == user_id).first()
-
-    if not db_user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"User with id {user_id} not found"
-        )
+    db = ScopedSession()
+    if not delete_returning(db, UserModel, user_id):
+        raise not_found("User", user_id)
 
-    db.delete(db_user)
     db.commit()
+    evict_cached(UserModel, user_id)
+    invalidate_cached_user(user_id)
     return None
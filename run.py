@@ -1,14 +1,34 @@
 """
-Development server runner for ERP Inventory Manager API
+Server runner for ERP Inventory Manager API
 Run this file to start the FastAPI server
+
+    python run.py                  # Development: auto-reload, one process
+    ENV=production python run.py   # Production: several workers, uvloop + httptools
 """
+import os
+
 import uvicorn
 
 if __name__ == "__main__":
-    uvicorn.run(
-        "app.main:app",
-        host="127.0.0.1",
-        port=8000,
-        reload=True,  # Auto-reload on code changes
-        log_level="info"
-    )
+    if os.getenv("ENV") == "production":
+        # Worker processes share the SQLite file (WAL mode lets them
+        # read while another writes). uvloop/httptools replace the
+        # pure-Python event loop and HTTP parser.
+        uvicorn.run(
+            "app.main:app",
+            host="0.0.0.0",
+            port=8000,
+            workers=max(2, os.cpu_count() or 1),
+            loop="uvloop",
+            http="httptools",
+            limit_concurrency=500,  # Answer 503 instead of queueing forever
+            log_level="warning"
+        )
+    else:
+        uvicorn.run(
+            "app.main:app",
+            host="127.0.0.1",
+            port=8000,
+            reload=True,  # Auto-reload on code changes
+            log_level="info"
+        )